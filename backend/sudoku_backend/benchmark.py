@@ -0,0 +1,35 @@
+import random
+import time
+
+from routes.daily_puzzle import SIZES, generate_sudoku
+from service.solver import count_solutions
+
+RUNS = 3
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    rng = random.Random(0)
+    print(f"{'size':>5} {'generate (s)':>13} {'empty %':>8} {'solve (s)':>10} {'unique check (s)':>17}")
+    for size, base in SIZES.items():
+        gen_times, solve_times, count_times, empty = [], [], [], []
+        for _ in range(RUNS):
+            puzzle, t = timed(generate_sudoku, 'hard', base, rng)
+            gen_times.append(t)
+            empty.append(sum(row.count(0) for row in puzzle) / (size * size))
+            _, t = timed(count_solutions, puzzle, limit=1)
+            solve_times.append(t)
+            (count, _), t = timed(count_solutions, puzzle, limit=2)
+            count_times.append(t)
+            assert count == 1
+        print(f"{size:>5} {sum(gen_times) / RUNS:>13.3f} {100 * sum(empty) / RUNS:>8.1f} {sum(solve_times) / RUNS:>10.4f} "
+              f"{sum(count_times) / RUNS:>17.4f}")
+
+
+if __name__ == "__main__":
+    main()
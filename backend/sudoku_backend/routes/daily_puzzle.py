@@ -1,22 +1,48 @@
 import random
+import threading
+from math import isqrt
 from datetime import datetime
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
+
+from service.difficulty_analization import get_candidates
+from service.solver import SearchLimitExceeded, count_solutions
 
 daily_puzzle_bp = Blueprint("daily_puzzle", __name__)
 
-# Cache for the daily puzzle
-current_puzzle = None
+SIZES = {4: 2, 9: 3, 16: 4, 25: 5}
+
+# Empty cells per 81 for each difficulty
+EMPTIES = {
+    'easy': (36, 42),
+    'medium': (46, 52),
+    'hard': (56, 64)
+}
+
+# Branching search nodes allowed for one uniqueness check, by base. A removal that
+# can't be proven unique within it is undone, so the puzzle may end up easier than
+# requested. 16x16 and 25x25 only keep removals that singles alone resolve, since
+# branching searches at those sizes are too slow. A node limit rather than a time
+# limit keeps seeded puzzles reproducible.
+CHECK_NODES = {2: 1000, 3: 1000, 4: 0, 5: 0}
+
+# Cache for the daily puzzle, one per board size
+current_puzzles = {}
 current_puzzle_date = None
+current_puzzle_lock = threading.Lock()
 
 
-def generate_sudoku(difficulty='medium'):
-    """Generate a Sudoku puzzle of given difficulty"""
-    base = 3
+def generate_sudoku(difficulty='medium', base=3, rng=None):
+    """
+    Generate a Sudoku puzzle with a unique solution, aiming for the given difficulty.
+    Use reached_difficulty to label the result, it can fall short on big boards.
+    Pass a seeded random.Random as rng for a reproducible puzzle.
+    """
+    rng = rng or random.Random()
     side = base * base
 
     def pattern(r, c): return (base * (r % base) + r // base + c) % side
 
-    def shuffle(s): return random.sample(s, len(s))
+    def shuffle(s): return rng.sample(s, len(s))
 
     rBase = range(base)
     rows = [g * base + r for g in shuffle(rBase) for r in shuffle(rBase)]
@@ -26,38 +52,96 @@ def generate_sudoku(difficulty='medium'):
     board = [[nums[pattern(r, c)] for c in cols] for r in rows]
 
     squares = side * side
-    empties = {
-        'easy': random.randint(36, 42),
-        'medium': random.randint(46, 52),
-        'hard': random.randint(56, 64)
-    }[difficulty]
-
-    for p in random.sample(range(squares), empties):
-        board[p // side][p % side] = 0
+    lo, hi = EMPTIES[difficulty]
+    empties = rng.randint(round(squares * lo / 81), round(squares * hi / 81))
+
+    # Only keep a removal if the puzzle still has exactly one solution
+    removed = 0
+    for p in rng.sample(range(squares), squares):
+        if removed == empties:
+            break
+        r, c = p // side, p % side
+        num = board[r][c]
+        board[r][c] = 0
+        if is_forced(board, r, c, num):
+            unique = True
+        else:
+            try:
+                unique = count_solutions(board, limit=2, max_nodes=CHECK_NODES[base])[0] == 1
+            except SearchLimitExceeded:
+                unique = False
+        if unique:
+            removed += 1
+        else:
+            board[r][c] = num
 
     return board
 
-def get_daily_puzzle():
-    global current_puzzle, current_puzzle_date
-
-    today = datetime.now().date()
-    if current_puzzle_date != today:
-        # Seed the random generator with today's date to ensure consistency
-        random.seed(int(today.strftime("%Y%m%d")))
-        current_puzzle = generate_sudoku('medium')
-        current_puzzle_date = today
 
-    return current_puzzle
+def is_forced(board, row, col, num):
+    """
+    Checks if num is the only way to fill an emptied cell, either as its only
+    candidate or as the only place left for num in its row, column or box.
+    A board that had one solution before the cell was emptied then still has one.
+    """
+    if get_candidates(board, row, col) == {num}:
+        return True
+
+    side = len(board)
+    base = isqrt(side)
+    box_row, box_col = (row // base) * base, (col // base) * base
+    units = [
+        [(row, j) for j in range(side)],
+        [(i, col) for i in range(side)],
+        [(i, j) for i in range(box_row, box_row + base) for j in range(box_col, box_col + base)],
+    ]
+    for unit in units:
+        if not any(board[i][j] == 0 and (i, j) != (row, col) and num in get_candidates(board, i, j)
+                   for i, j in unit):
+            return True
+    return False
+
+
+def reached_difficulty(board):
+    """Returns the hardest difficulty whose share of empty cells the board reaches"""
+    empty = sum(row.count(0) for row in board) * 81 / (len(board) ** 2)
+    reached = 'easy'
+    for difficulty, (lo, _) in EMPTIES.items():
+        if empty >= lo:
+            reached = difficulty
+    return reached
+
+
+def get_daily_puzzle(size=9):
+    global current_puzzle_date
+
+    with current_puzzle_lock:
+        today = datetime.now().date()
+        if current_puzzle_date != today:
+            current_puzzles.clear()
+            current_puzzle_date = today
+        if size not in current_puzzles:
+            # Seed with today's date and size to ensure consistency
+            seed = int(today.strftime("%Y%m%d"))
+            rng = random.Random(seed if size == 9 else seed * 100 + size)
+            current_puzzles[size] = generate_sudoku('medium', SIZES[size], rng)
+
+        return current_puzzles[size], current_puzzle_date
 
 
 @daily_puzzle_bp.route("/daily", methods=["GET"])
 def daily_puzzle():
+    size = request.args.get("size", 9, type=int)
+    if size not in SIZES:
+        return jsonify({"error": "Invalid size"}), 400
+
     try:
-        puzzle = get_daily_puzzle()
+        puzzle, date = get_daily_puzzle(size)
         return jsonify({
             "grid": puzzle,
-            "date": current_puzzle_date.isoformat(),
-            "difficulty": "medium"
+            "date": date.isoformat(),
+            "difficulty": reached_difficulty(puzzle),
+            "size": size
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
\ No newline at end of file
@@ -1,27 +1,51 @@
-from flask import Blueprint, request, jsonify
+import math
+import time
 
-from routes.daily_puzzle import generate_sudoku
-from service.board_scan import recognise_sudoku
+from flask import Blueprint, Response, request, jsonify
+
+from routes.daily_puzzle import SIZES, generate_sudoku, reached_difficulty
 from io import BytesIO
 from PIL import Image
 import numpy as np
 
+from service import batch
 from service.solver import analyze_sudoku, solve
 
 sudoku_bp = Blueprint("sudoku", __name__)
 
+SOLVE_TIME_LIMIT = 5.0
+
 
 @sudoku_bp.route("/recognise", methods=["POST"])
 def recognise_endpoint():
     if "image" not in request.files:
         return jsonify({"error": "No image uploaded"}), 400
 
+    # Imported here so batch worker processes, which re-import main.py under spawn,
+    # don't each load torch and the digit model
+    from service.board_scan import cell_probabilities, decode_sudoku, recognise_sudoku
+
     try:
         file = request.files["image"]
         img = Image.open(BytesIO(file.read())).convert("RGB")
         img_np = np.array(img)
-        grid = recognise_sudoku(img_np)
-        return jsonify({"grid": grid})
+
+        if request.form.get("mode") != "joint":
+            grid = recognise_sudoku(img_np)
+            return jsonify({"grid": grid})
+
+        top_k = int(request.form.get("top_k", 3))
+        time_budget = float(request.form.get("time_budget", 0.5))
+        if not 1 <= top_k <= 10:
+            return jsonify({"error": "top_k must be between 1 and 10"}), 400
+        if not math.isfinite(time_budget) or not 0 < time_budget <= 2.0:
+            return jsonify({"error": "time_budget must be between 0 and 2 seconds"}), 400
+
+        decoded = decode_sudoku(cell_probabilities(img_np), top_k, time_budget)
+        if decoded is None:
+            return jsonify({"error": "No consistent reading with a unique solution found"}), 400
+        grid, solution, corrected = decoded
+        return jsonify({"grid": grid, "solution": solution, "corrected": corrected})
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
@@ -34,19 +58,23 @@ def analyze():
     grid = data.get("grid")
     if not grid or len(grid) != 9 or not all(len(row) == 9 for row in grid):
         return jsonify({"error": "Invalid grid"}), 400
-    return analyze_sudoku(grid)
+    return analyze_sudoku(grid, deadline=time.monotonic() + SOLVE_TIME_LIMIT)
 
 
 @sudoku_bp.route("/generate", methods=["POST"])
 def generate_puzzle():
     data = request.get_json()
     difficulty = data.get("difficulty", "medium")
+    size = data.get("size", 9)
+    if type(size) is not int or size not in SIZES:
+        return jsonify({"error": "Invalid size"}), 400
 
     try:
-        puzzle = generate_sudoku(difficulty)
+        puzzle = generate_sudoku(difficulty, SIZES[size])
         return jsonify({
             "grid": puzzle,
-            "difficulty": difficulty
+            "difficulty": reached_difficulty(puzzle),
+            "size": size
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -58,11 +86,76 @@ def solve_grid():
 
     if not grid or not isinstance(grid, list) or not all(isinstance(row, list) for row in grid):
         return jsonify({"error": "Invalid grid format"}), 400
+    size = len(grid)
+    if size not in SIZES or not all(len(row) == size for row in grid):
+        return jsonify({"error": "Invalid grid size"}), 400
+    if not all(type(cell) is int and 0 <= cell <= size for row in grid for cell in row):
+        return jsonify({"error": "Cells must be integers from 0 to the grid size"}), 400
 
     solved_grid = [row[:] for row in grid]  # deep copy
 
-    if not solve(solved_grid):
+    try:
+        solvable = solve(solved_grid, deadline=time.monotonic() + SOLVE_TIME_LIMIT)
+    except TimeoutError:
+        return jsonify({"error": "Puzzle took too long to solve"}), 400
+    if not solvable:
         return jsonify({"error": "Could not solve puzzle"}), 400
 
     return jsonify({ "solution": solved_grid })
 
+
+def batch_response(worker, with_difficulty):
+    """
+    Solves or grades many grids in one request.
+    text/plain bodies hold one 81-char grid per line and get one
+    '<status>,[<difficulty>,]<solution>' line back per grid. Binary bodies hold
+    81 bytes per grid, or 41 bytes with ?packed=1, and get fixed-size records
+    back: a status byte, a difficulty byte for /analyze and the grid in the same packing.
+    """
+    packed = request.args.get("packed") == "1"
+    binary = request.mimetype == "application/octet-stream"
+
+    if binary:
+        max_bytes = batch.MAX_BATCH * (batch.PACKED_SIZE if packed else batch.RAW_SIZE)
+    else:
+        max_bytes = batch.MAX_BATCH * batch.TEXT_LINE_SIZE
+    too_large = jsonify({"error": f"At most {batch.MAX_BATCH} grids per batch"}), 413
+    # Reject oversized bodies before reading and parsing them
+    if (request.content_length or 0) > max_bytes:
+        return too_large
+    body = request.get_data()
+    if len(body) > max_bytes:
+        return too_large
+
+    try:
+        if binary:
+            grids = batch.parse_binary(body, packed)
+        else:
+            text = body.decode("utf-8", errors="replace")
+            if text.count("\n") > batch.MAX_BATCH:
+                return too_large
+            grids = batch.parse_text(text)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if len(grids) > batch.MAX_BATCH:
+        return too_large
+
+    def generate():
+        for result in batch.run_batch(worker, grids):
+            if binary:
+                yield batch.encode_binary(result, packed, with_difficulty)
+            else:
+                yield batch.encode_text(result, with_difficulty)
+
+    mimetype = "application/octet-stream" if binary else "text/plain"
+    return Response(generate(), mimetype=mimetype)
+
+
+@sudoku_bp.route('/solve/batch', methods=['POST'])
+def solve_batch():
+    return batch_response(batch.solve_one, with_difficulty=False)
+
+
+@sudoku_bp.route('/analyze/batch', methods=['POST'])
+def analyze_batch():
+    return batch_response(batch.analyze_one, with_difficulty=True)
@@ -0,0 +1,165 @@
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from service.difficulty_analization import analyze_difficulty
+from service.solver import count_solutions, is_too_easy
+
+# Per-grid status codes
+OK = 0
+INVALID = 1
+UNSOLVABLE = 2
+TOO_EASY = 3
+TIMEOUT = 4
+NOT_UNIQUE = 5
+
+DIFFICULTY_CODES = {"easy": 1, "medium": 2, "hard": 3}
+
+MAX_BATCH = 10000
+PARALLEL_THRESHOLD = 32
+RAW_SIZE = 81
+PACKED_SIZE = 41
+TEXT_LINE_SIZE = 83  # 81 chars plus CRLF
+GRID_TIME_LIMIT = 1.0
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """Returns the worker pool for large batches, starting it on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            try:
+                # spawn, not fork: the server process is threaded and may have torch/CUDA loaded
+                _executor = ProcessPoolExecutor(max_workers=os.cpu_count(),
+                                                mp_context=multiprocessing.get_context("spawn"))
+            except (OSError, NotImplementedError) as e:
+                logging.warning("Batch worker pool unavailable, running batches serially: %s", e)
+                return None
+            atexit.register(shutdown_executor)
+        return _executor
+
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(cancel_futures=True)
+            _executor = None
+
+
+# Decoding
+def parse_text(body):
+    """
+    Parses one 81-char grid per line, '0' or '.' for blanks. Bad lines, including
+    blank lines between grids, become None so result N always matches line N.
+    Trailing blank lines are ignored.
+    """
+    lines = body.splitlines()
+    while lines and not lines[-1].strip():
+        lines.pop()
+
+    grids = []
+    for line in lines:
+        line = line.strip()
+        if len(line) != 81 or any(ch not in ".0123456789" for ch in line):
+            grids.append(None)
+            continue
+        grids.append([[0 if ch == "." else int(ch) for ch in line[r * 9:(r + 1) * 9]] for r in range(9)])
+    return grids
+
+
+def parse_binary(body, packed=False):
+    """Parses 81 bytes per grid, or 41 bytes per grid with two cells per byte (high nibble first)"""
+    size = PACKED_SIZE if packed else RAW_SIZE
+    if len(body) % size != 0:
+        raise ValueError(f"Body length must be a multiple of {size} bytes")
+
+    grids = []
+    for start in range(0, len(body), size):
+        chunk = body[start:start + size]
+        if packed:
+            cells = []
+            for byte in chunk:
+                cells.append(byte >> 4)
+                cells.append(byte & 0x0F)
+            cells = cells[:81]
+        else:
+            cells = list(chunk)
+        if any(cell > 9 for cell in cells):
+            grids.append(None)
+            continue
+        grids.append([cells[r * 9:(r + 1) * 9] for r in range(9)])
+    return grids
+
+
+# Encoding
+def _flatten(grid):
+    return [cell for row in grid for cell in row] if grid else [0] * 81
+
+
+def encode_text(result, with_difficulty=False):
+    """Encodes a result as '<status>,<solution>' or '<status>,<difficulty>,<solution>'"""
+    status, solution, difficulty = result
+    fields = [str(status)]
+    if with_difficulty:
+        fields.append(difficulty or "")
+    fields.append("".join(map(str, _flatten(solution))) if solution else "")
+    return ",".join(fields) + "\n"
+
+
+def encode_binary(result, packed=False, with_difficulty=False):
+    """Encodes a result as a status byte, an optional difficulty byte and the solution grid"""
+    status, solution, difficulty = result
+    header = [status]
+    if with_difficulty:
+        header.append(DIFFICULTY_CODES.get(difficulty, 0))
+    cells = _flatten(solution)
+    if packed:
+        cells = cells + [0]
+        cells = [(cells[i] << 4) | cells[i + 1] for i in range(0, len(cells), 2)]
+    return bytes(header + cells)
+
+
+# Workers
+def solve_one(grid):
+    if grid is None:
+        return INVALID, None, None
+    try:
+        count, solution = count_solutions(grid, limit=2, deadline=time.monotonic() + GRID_TIME_LIMIT)
+    except TimeoutError:
+        return TIMEOUT, None, None
+    if count == 0:
+        return UNSOLVABLE, None, None
+    if count > 1:
+        return NOT_UNIQUE, None, None
+    return OK, solution, None
+
+
+def analyze_one(grid):
+    if grid is None:
+        return INVALID, None, None
+    try:
+        count, solution = count_solutions(grid, limit=1, deadline=time.monotonic() + GRID_TIME_LIMIT)
+    except TimeoutError:
+        return TIMEOUT, None, None
+    if count == 0:
+        return UNSOLVABLE, None, None
+    if is_too_easy(grid):
+        return TOO_EASY, None, None
+    return OK, solution, analyze_difficulty(grid)
+
+
+def run_batch(worker, grids):
+    """Yields worker results in input order, spreading large batches across cores"""
+    executor = _get_executor() if len(grids) >= PARALLEL_THRESHOLD else None
+    if executor is None:
+        return map(worker, grids)
+    chunksize = max(1, len(grids) // (4 * (os.cpu_count() or 1)))
+    return executor.map(worker, grids, chunksize=chunksize)
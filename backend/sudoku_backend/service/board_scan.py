@@ -1,7 +1,11 @@
+import heapq
+import time
+
 import cv2
 import numpy as np
 import torch
 from model.model_training import DigitCNN
+from service.solver import count_solutions
 
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 MODEL_PATH = "model/digit_cnn_v2.pth"
@@ -44,9 +48,10 @@ def warp_to_fixed_grid(image):
     M = cv2.getPerspectiveTransform(ordered, dst)
     return cv2.warpPerspective(gray, M, (450, 450))
 
-def recognise_sudoku(image_np):
+def cell_probabilities(image_np):
+    """Returns a 9x9 grid with the class probabilities of each cell, or None for blank cells"""
     warped = warp_to_fixed_grid(image_np)
-    grid = np.zeros((9, 9), dtype=int)
+    probs = [[None] * 9 for _ in range(9)]
 
     for r in range(9):
         for c in range(9):
@@ -64,7 +69,72 @@ def recognise_sudoku(image_np):
             cell_resized = cv2.resize(clean, (28,28), interpolation=cv2.INTER_AREA)
             tensor = torch.from_numpy(cell_resized.astype("float32") / 255.).unsqueeze(0).unsqueeze(0).to(device)
             with torch.no_grad():
-                pred = torch.argmax(model(tensor)).item()
-            if pred != 0:
-                grid[r, c] = pred
+                probs[r][c] = torch.softmax(model(tensor), dim=1)[0].cpu().numpy()
+    return probs
+
+def recognise_sudoku(image_np):
+    grid = np.zeros((9, 9), dtype=int)
+    for r, row in enumerate(cell_probabilities(image_np)):
+        for c, p in enumerate(row):
+            if p is not None:
+                grid[r, c] = int(np.argmax(p))
     return grid.tolist()
+
+def decode_sudoku(probs, top_k=3, time_budget=0.5):
+    """
+    Finds the most probable reading of the givens that has exactly one solution.
+    Args:
+        probs: 9x9 grid from cell_probabilities
+        top_k: how many of the most likely classes to consider per cell (0 means blank)
+        time_budget: seconds to search before giving up
+    Returns:
+        (grid, solution, corrected) where corrected flags cells that differ from the
+        plain argmax reading, or None if nothing was found within the budget
+    """
+    deadline = time.monotonic() + time_budget
+    cells = []
+    options = []
+    for r in range(9):
+        for c in range(9):
+            p = probs[r][c]
+            if p is None:
+                continue
+            ranked = np.argsort(p)[::-1][:top_k]
+            logs = np.log(np.maximum(p[ranked], 1e-12))
+            cells.append((r, c))
+            options.append([(int(d), float(logs[0] - l)) for d, l in zip(ranked, logs)])
+
+    # Most uncertain cells first, so cheap corrections sit close to the heap root
+    order = sorted(range(len(cells)), key=lambda n: options[n][1][1] if len(options[n]) > 1 else float("inf"))
+    cells = [cells[n] for n in order]
+    options = [options[n] for n in order]
+
+    # Best-first over choice vectors; each state only bumps positions >= the last one
+    # it bumped, so every assignment is generated exactly once.
+    start = (0,) * len(cells)
+    heap = [(0.0, start, 0)]
+    while heap:
+        if time.monotonic() > deadline:
+            return None
+        cost, choice, last = heapq.heappop(heap)
+
+        grid = [[0] * 9 for _ in range(9)]
+        for (r, c), opts, k in zip(cells, options, choice):
+            grid[r][c] = opts[k][0]
+        try:
+            count, solution = count_solutions(grid, limit=2, deadline=deadline)
+        except TimeoutError:
+            return None
+        if count == 1:
+            corrected = [[False] * 9 for _ in range(9)]
+            for (r, c), k in zip(cells, choice):
+                corrected[r][c] = k != 0
+            return grid, solution, corrected
+
+        for n in range(last, len(cells)):
+            k = choice[n] + 1
+            if k < len(options[n]):
+                bumped = choice[:n] + (k,) + choice[n + 1:]
+                step = options[n][k][1] - options[n][choice[n]][1]
+                heapq.heappush(heap, (cost + step, bumped, n))
+    return None
@@ -1,7 +1,11 @@
+from math import isqrt
+
+
 def analyze_difficulty(grid):
     from copy import deepcopy
 
-    candidates_grid = [[get_candidates(grid, i, j) for j in range(9)] for i in range(9)]
+    side = len(grid)
+    candidates_grid = [[get_candidates(grid, i, j) for j in range(side)] for i in range(side)]
     working_grid = deepcopy(grid)
     techniques_used = set()
 
@@ -37,9 +41,10 @@ def analyze_difficulty(grid):
         return "hard"
 
 def apply_naked_singles(grid, candidates_grid):
+    side = len(grid)
     changed = False
-    for i in range(9):
-        for j in range(9):
+    for i in range(side):
+        for j in range(side):
             if grid[i][j] == 0 and len(candidates_grid[i][j]) == 1:
                 num = candidates_grid[i][j].pop()
                 grid[i][j] = num
@@ -49,9 +54,10 @@ def apply_naked_singles(grid, candidates_grid):
 
 
 def apply_hidden_singles(grid, candidates_grid):
+    side = len(grid)
     changed = False
-    for i in range(9):
-        for j in range(9):
+    for i in range(side):
+        for j in range(side):
             if grid[i][j] == 0:
                 for num in candidates_grid[i][j]:
                     # Check row
@@ -76,16 +82,18 @@ def apply_hidden_singles(grid, candidates_grid):
 
 
 def apply_naked_pairs(grid, candidates_grid):
+    side = len(grid)
+    base = isqrt(side)
     changed = False
     # Check rows
-    for i in range(9):
+    for i in range(side):
         pairs = {}
-        for j in range(9):
+        for j in range(side):
             if grid[i][j] == 0 and len(candidates_grid[i][j]) == 2:
                 pair = tuple(sorted(candidates_grid[i][j]))
                 if pair in pairs:
                     # Found naked pair - remove these candidates from other cells in row
-                    for other_j in range(9):
+                    for other_j in range(side):
                         if other_j != j and other_j != pairs[pair] and grid[i][other_j] == 0:
                             before = len(candidates_grid[i][other_j])
                             candidates_grid[i][other_j] -= set(pair)
@@ -95,14 +103,14 @@ def apply_naked_pairs(grid, candidates_grid):
                     pairs[pair] = j
 
     # Check columns
-    for j in range(9):
+    for j in range(side):
         pairs = {}
-        for i in range(9):
+        for i in range(side):
             if grid[i][j] == 0 and len(candidates_grid[i][j]) == 2:
                 pair = tuple(sorted(candidates_grid[i][j]))
                 if pair in pairs:
                     # Found naked pair - remove these candidates from other cells in column
-                    for other_i in range(9):
+                    for other_i in range(side):
                         if other_i != i and other_i != pairs[pair] and grid[other_i][j] == 0:
                             before = len(candidates_grid[other_i][j])
                             candidates_grid[other_i][j] -= set(pair)
@@ -112,17 +120,17 @@ def apply_naked_pairs(grid, candidates_grid):
                     pairs[pair] = i
 
     # Check boxes
-    for box_row in range(0, 9, 3):
-        for box_col in range(0, 9, 3):
+    for box_row in range(0, side, base):
+        for box_col in range(0, side, base):
             pairs = {}
-            for i in range(box_row, box_row + 3):
-                for j in range(box_col, box_col + 3):
+            for i in range(box_row, box_row + base):
+                for j in range(box_col, box_col + base):
                     if grid[i][j] == 0 and len(candidates_grid[i][j]) == 2:
                         pair = tuple(sorted(candidates_grid[i][j]))
                         if pair in pairs:
                             # Found naked pair - remove these candidates from other cells in box
-                            for other_i in range(box_row, box_row + 3):
-                                for other_j in range(box_col, box_col + 3):
+                            for other_i in range(box_row, box_row + base):
+                                for other_j in range(box_col, box_col + base):
                                     if (other_i != i or other_j != j) and (
                                             other_i != pairs[pair][0] or other_j != pairs[pair][1]) and grid[other_i][
                                         other_j] == 0:
@@ -136,15 +144,17 @@ def apply_naked_pairs(grid, candidates_grid):
 
 
 def apply_locked_candidates(grid, candidates_grid):
+    side = len(grid)
+    base = isqrt(side)
     changed = False
     # Check for candidates locked in a box's row/column
-    for box_row in range(0, 9, 3):
-        for box_col in range(0, 9, 3):
-            for num in range(1, 10):
+    for box_row in range(0, side, base):
+        for box_col in range(0, side, base):
+            for num in range(1, side + 1):
                 # Find all positions of this number in the box
                 positions = []
-                for i in range(box_row, box_row + 3):
-                    for j in range(box_col, box_col + 3):
+                for i in range(box_row, box_row + base):
+                    for j in range(box_col, box_col + base):
                         if grid[i][j] == 0 and num in candidates_grid[i][j]:
                             positions.append((i, j))
 
@@ -153,8 +163,8 @@ def apply_locked_candidates(grid, candidates_grid):
                     if all(pos[0] == positions[0][0] for pos in positions):
                         row = positions[0][0]
                         # Eliminate from rest of row
-                        for j in range(9):
-                            if j < box_col or j >= box_col + 3:
+                        for j in range(side):
+                            if j < box_col or j >= box_col + base:
                                 if grid[row][j] == 0 and num in candidates_grid[row][j]:
                                     candidates_grid[row][j].remove(num)
                                     changed = True
@@ -163,8 +173,8 @@ def apply_locked_candidates(grid, candidates_grid):
                     elif all(pos[1] == positions[0][1] for pos in positions):
                         col = positions[0][1]
                         # Eliminate from rest of column
-                        for i in range(9):
-                            if i < box_row or i >= box_row + 3:
+                        for i in range(side):
+                            if i < box_row or i >= box_row + base:
                                 if grid[i][col] == 0 and num in candidates_grid[i][col]:
                                     candidates_grid[i][col].remove(num)
                                     changed = True
@@ -174,6 +184,8 @@ def apply_locked_candidates(grid, candidates_grid):
 # Helper functions
 def get_candidates(grid, row, col):
     """Returns possible numbers for a cell as a set"""
+    side = len(grid)
+    base = isqrt(side)
     if grid[row][col] != 0:
         return set()
 
@@ -181,62 +193,68 @@ def get_candidates(grid, row, col):
     # Check row
     used.update(grid[row])
     # Check column
-    used.update(grid[i][col] for i in range(9))
+    used.update(grid[i][col] for i in range(side))
     # Check box
-    box_row, box_col = (row // 3) * 3, (col // 3) * 3
-    used.update(grid[i][j] for i in range(box_row, box_row + 3)
-                for j in range(box_col, box_col + 3))
+    box_row, box_col = (row // base) * base, (col // base) * base
+    used.update(grid[i][j] for i in range(box_row, box_row + base)
+                for j in range(box_col, box_col + base))
 
-    return set(range(1, 10)) - used
+    return set(range(1, side + 1)) - used
 
 
 def eliminate_candidates(candidates_grid, row, col, nums):
     """
     Removes specific candidates from a cell and propagates the elimination to affected cells
     Args:
-        candidates_grid: 9x9 grid of sets containing possible numbers for each cell
-        row, col: The cell coordinates (0-8) where a number was placed
+        candidates_grid: side x side grid of sets containing possible numbers for each cell
+        row, col: The cell coordinates where a number was placed
         nums: The number(s) that were placed in this cell (as a list)
     """
+    side = len(candidates_grid)
+    base = isqrt(side)
     # Remove all candidates from the solved cell
     candidates_grid[row][col] = set()
 
     # Remove these numbers from candidates in the same row
-    for j in range(9):
+    for j in range(side):
         if j != col:
             candidates_grid[row][j] -= set(nums)
 
     # Remove these numbers from candidates in the same column
-    for i in range(9):
+    for i in range(side):
         if i != row:
             candidates_grid[i][col] -= set(nums)
 
-    # Remove these numbers from candidates in the same 3x3 box
-    box_row, box_col = (row // 3) * 3, (col // 3) * 3
-    for i in range(box_row, box_row + 3):
-        for j in range(box_col, box_col + 3):
+    # Remove these numbers from candidates in the same box
+    box_row, box_col = (row // base) * base, (col // base) * base
+    for i in range(box_row, box_row + base):
+        for j in range(box_col, box_col + base):
             if i != row or j != col:
                 candidates_grid[i][j] -= set(nums)
 
 
 def is_unique_in_row(candidates_grid, num, row, col):
-    for j in range(9):
+    side = len(candidates_grid)
+    for j in range(side):
         if j != col and num in candidates_grid[row][j]:
             return False
     return True
 
 
 def is_unique_in_col(candidates_grid, num, row, col):
-    for i in range(9):
+    side = len(candidates_grid)
+    for i in range(side):
         if i != row and num in candidates_grid[i][col]:
             return False
     return True
 
 
 def is_unique_in_box(candidates_grid, num, row, col):
-    box_row, box_col = (row // 3) * 3, (col // 3) * 3
-    for i in range(box_row, box_row + 3):
-        for j in range(box_col, box_col + 3):
+    side = len(candidates_grid)
+    base = isqrt(side)
+    box_row, box_col = (row // base) * base, (col // base) * base
+    for i in range(box_row, box_row + base):
+        for j in range(box_col, box_col + base):
             if (i != row or j != col) and num in candidates_grid[i][j]:
                 return False
     return True
@@ -0,0 +1,158 @@
+import time
+from math import isqrt
+
+# Column kinds, ints rather than strings so set and dict order never depends on the hash seed
+CELL, ROW, COL, BOX = range(4)
+
+
+class SearchLimitExceeded(Exception):
+    """Raised when a search visits more nodes than max_nodes allows"""
+
+
+def _constraints(base, r, c, num):
+    """Returns the four exact-cover columns a digit placement satisfies"""
+    b = (r // base) * base + c // base
+    return (
+        (CELL, r, c),
+        (ROW, r, num),
+        (COL, c, num),
+        (BOX, b, num),
+    )
+
+
+def build_cover(grid):
+    """
+    Builds the exact-cover matrix for a grid of any size.
+    Returns (X, Y) where X maps each open column to the set of rows covering it and
+    Y maps each row (r, c, num) to its columns, or None if the givens clash.
+    Only placements consistent with the givens become rows, which keeps the matrix
+    small for nearly full boards.
+    """
+    side = len(grid)
+    base = isqrt(side)
+    rows, cols, boxes = [0] * side, [0] * side, [0] * side
+    empties = []
+    for r in range(side):
+        for c in range(side):
+            num = grid[r][c]
+            b = (r // base) * base + c // base
+            if num == 0:
+                empties.append((r, c, b))
+                continue
+            if not 1 <= num <= side:
+                return None
+            bit = 1 << num
+            if (rows[r] | cols[c] | boxes[b]) & bit:
+                return None
+            rows[r] |= bit
+            cols[c] |= bit
+            boxes[b] |= bit
+
+    X = {}
+    for r, c, _ in empties:
+        X[(CELL, r, c)] = set()
+    for unit in range(side):
+        for num in range(1, side + 1):
+            bit = 1 << num
+            if not rows[unit] & bit:
+                X[(ROW, unit, num)] = set()
+            if not cols[unit] & bit:
+                X[(COL, unit, num)] = set()
+            if not boxes[unit] & bit:
+                X[(BOX, unit, num)] = set()
+
+    Y = {}
+    all_digits = ((1 << side) - 1) << 1
+    for r, c, b in empties:
+        free = all_digits & ~(rows[r] | cols[c] | boxes[b])
+        while free:
+            bit = free & -free
+            free ^= bit
+            num = bit.bit_length() - 1
+            row = (r, c, num)
+            Y[row] = ((CELL, r, c), (ROW, r, num), (COL, c, num), (BOX, b, num))
+            for col in Y[row]:
+                X[col].add(row)
+    return X, Y
+
+
+def _select(X, Y, row):
+    removed = []
+    for col in Y[row]:
+        for other in X[col]:
+            for other_col in Y[other]:
+                if other_col != col:
+                    X[other_col].remove(other)
+        removed.append(X.pop(col))
+    return removed
+
+
+def _deselect(X, Y, row, removed):
+    for col in reversed(Y[row]):
+        X[col] = removed.pop()
+        for other in X[col]:
+            for other_col in Y[other]:
+                if other_col != col:
+                    X[other_col].add(other)
+
+
+def _search(X, Y, partial, deadline, budget):
+    if not X:
+        yield list(partial)
+        return
+    if deadline is not None and time.monotonic() > deadline:
+        raise TimeoutError("Exact cover search exceeded the time budget")
+    # Column with the fewest rows; one with at most one row can't be beaten
+    col = None
+    size = float("inf")
+    for key, rows in X.items():
+        if len(rows) < size:
+            col, size = key, len(rows)
+            if size <= 1:
+                break
+    if budget is not None and size > 1:
+        budget[0] -= 1
+        if budget[0] < 0:
+            raise SearchLimitExceeded("Exact cover search exceeded the node limit")
+    for row in list(X[col]):
+        partial.append(row)
+        removed = _select(X, Y, row)
+        yield from _search(X, Y, partial, deadline, budget)
+        _deselect(X, Y, row, removed)
+        partial.pop()
+
+
+def iter_solutions(grid, deadline=None, max_nodes=None):
+    """
+    Yields every solution of the grid as a new list of lists.
+    Raises TimeoutError once time.monotonic() passes deadline, and
+    SearchLimitExceeded after max_nodes branching nodes (forced moves are free).
+    """
+    cover = build_cover(grid)
+    if cover is None:
+        return
+    X, Y = cover
+    budget = None if max_nodes is None else [max_nodes]
+    for rows in _search(X, Y, [], deadline, budget):
+        solution = [row[:] for row in grid]
+        for r, c, num in rows:
+            solution[r][c] = num
+        yield solution
+
+
+def count_solutions(grid, limit=2, deadline=None, max_nodes=None):
+    """
+    Counts solutions of the grid up to limit, returns (count, first solution).
+    Raises TimeoutError once time.monotonic() passes deadline, and
+    SearchLimitExceeded after max_nodes branching nodes, which unlike the
+    deadline gives the same answer on every run.
+    """
+    count = 0
+    first = None
+    for solution in iter_solutions(grid, deadline, max_nodes):
+        if first is None:
+            first = solution
+        count += 1
+        if count >= limit:
+            break
+    return count, first
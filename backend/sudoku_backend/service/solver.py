@@ -1,16 +1,22 @@
+from math import isqrt
+
 from flask import jsonify
 
 from service.difficulty_analization import analyze_difficulty
+from service.exact_cover import SearchLimitExceeded, count_solutions
 
 
-def analyze_sudoku(grid):
+def analyze_sudoku(grid, deadline=None):
     solved_grid = [row[:] for row in grid]
 
-    if not solve(solved_grid):
+    try:
+        solvable = solve(solved_grid, deadline)
+    except TimeoutError:
+        return jsonify({"error": "Puzzle took too long to solve"}), 400
+    if not solvable:
         return jsonify({"error": "Puzzle is not solvable."}), 400
 
-    filled = sum(cell != 0 for row in grid for cell in row)
-    if filled > 50:
+    if is_too_easy(grid):
         return jsonify({"error": "Puzzle is too easy to solve."}), 400
     difficulty = analyze_difficulty(grid)
 
@@ -19,44 +25,48 @@ def analyze_sudoku(grid):
         "solution": solved_grid
     })
 
+def is_too_easy(grid):
+    """More than 50 of 81 cells filled, scaled to the board size"""
+    filled = sum(cell != 0 for row in grid for cell in row)
+    return filled * 81 > 50 * len(grid) ** 2
+
+
 def find_empty(grid):
-    for i in range(9):
-        for j in range(9):
+    side = len(grid)
+    for i in range(side):
+        for j in range(side):
             if grid[i][j] == 0:
                 return i, j
     return None
 
 
 def is_valid(grid, num, pos):
+    side = len(grid)
+    base = isqrt(side)
     row, col = pos
-    for j in range(9):
+    for j in range(side):
         if grid[row][j] == num and j != col:
             return False
-    for i in range(9):
+    for i in range(side):
         if grid[i][col] == num and i != row:
             return False
-    box_x = col // 3
-    box_y = row // 3
-    for i in range(box_y * 3, box_y * 3 + 3):
-        for j in range(box_x * 3, box_x * 3 + 3):
+    box_x = col // base
+    box_y = row // base
+    for i in range(box_y * base, box_y * base + base):
+        for j in range(box_x * base, box_x * base + base):
             if grid[i][j] == num and (i, j) != pos:
                 return False
     return True
 
 
-def solve(grid):
-    empty = find_empty(grid)
-    if not empty:
-        return True
-    row, col = empty
-
-    for num in range(1, 10):
-        if is_valid(grid, num, (row, col)):
-            grid[row][col] = num
-            if solve(grid):
-                return True
-            grid[row][col] = 0
-    return False
+def solve(grid, deadline=None):
+    """Solves the grid in place, returns False if it has no solution"""
+    count, solution = count_solutions(grid, limit=1, deadline=deadline)
+    if count == 0:
+        return False
+    for i, row in enumerate(solution):
+        grid[i][:] = row
+    return True
 
 
 def get_candidates(grid, row, col):
@@ -64,17 +74,18 @@ def get_candidates(grid, row, col):
         return []
 
     candidates = []
-    for num in range(1, 10):
+    for num in range(1, len(grid) + 1):
         if is_valid(grid, num, (row, col)):
             candidates.append(num)
     return candidates
 
 
 def find_hint(grid):
-    min_candidates = 10
+    side = len(grid)
+    min_candidates = side + 1
     hint = None
-    for i in range(9):
-        for j in range(9):
+    for i in range(side):
+        for j in range(side):
             if grid[i][j] == 0:
                 candidates = get_candidates(grid, i, j)
                 if 0 < len(candidates) < min_candidates: